@@ -1,13 +1,71 @@
+import hashlib
+import io
+import os
+
 import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
+from tsdownsample import LTTBDownsampler
 
 from src.data_io import load_sales, latest_baseline
 from src.demand import estimate_elasticity
 from src.optimize import solve_prices
-from src.report import summarize
+from src.report import summarize, top_k
+
+SAMPLE_PATH = "data/sales_sample.csv"
+DATA_CACHE_ENTRIES = 4   # datasets kept per data step (full sales frames)
+SOLVE_CACHE_ENTRIES = 32 # rule combinations kept for the price book and its CSV
+MAX_CURVE_POINTS = 500   # demand curve is LTTB-downsampled above this
+MAX_BAR_SKUS = 50        # profit comparison keeps the SKUs with the largest change
+MAX_TABLE_SKUS = 50      # results table shows the biggest profit gains; CSV has all
+
+# -------------------- Cached pipeline steps --------------------
+# Every step is keyed on data_key, a digest of the uploaded bytes (or the sample's
+# path and mtime). Frames are passed as unhashed "_" arguments: Streamlit only hashes
+# a sample of rows for large frames, which would serve stale results after a re-upload.
+@st.cache_data(show_spinner=False, max_entries=DATA_CACHE_ENTRIES)
+def cached_sales(data_key: str, _source) -> pd.DataFrame:
+    if isinstance(_source, bytes):
+        _source = io.BytesIO(_source)
+    return load_sales(_source)
+
+@st.cache_data(show_spinner=False, max_entries=DATA_CACHE_ENTRIES)
+def cached_elasticity(data_key: str, _df: pd.DataFrame) -> pd.DataFrame:
+    return estimate_elasticity(_df)
+
+@st.cache_data(show_spinner=False, max_entries=DATA_CACHE_ENTRIES)
+def cached_baseline(data_key: str, _df: pd.DataFrame) -> pd.DataFrame:
+    return latest_baseline(_df)
+
+# row positions of each SKU, ordered by price, so a selection is a dict lookup + iloc
+@st.cache_data(show_spinner=False, max_entries=DATA_CACHE_ENTRIES)
+def sku_positions(data_key: str, _df: pd.DataFrame) -> dict:
+    ordered = _df[["sku", "price"]].reset_index(drop=True).sort_values("price", kind="stable")
+    groups = ordered.groupby("sku", observed=True, sort=False).groups
+    return {sku: groups[sku].to_numpy() for sku in _df["sku"].unique()}
+
+@st.cache_data(show_spinner=False, max_entries=SOLVE_CACHE_ENTRIES)
+def cached_price_book(data_key: str, _base: pd.DataFrame, _elas: pd.DataFrame,
+                      price_bounds_pct, min_margin_pct) -> pd.DataFrame:
+    chosen = solve_prices(_base, _elas, price_bounds_pct=price_bounds_pct, min_margin_pct=min_margin_pct)
+    if chosen.empty:
+        return chosen
+
+    rep = summarize(_base, chosen)
+    # Make quantities integers for realism
+    if "opt_qty" in rep.columns:
+        rep["opt_qty"] = rep["opt_qty"].round().astype(int)
+    if "base_units" in rep.columns:
+        rep["base_units"] = rep["base_units"].round().astype(int)
+    return rep
+
+@st.cache_data(show_spinner=False, max_entries=SOLVE_CACHE_ENTRIES)
+def price_book_csv(data_key: str, price_bounds_pct, min_margin_pct, _rep: pd.DataFrame) -> bytes:
+    buf = io.BytesIO()
+    _rep.to_csv(buf, index=False)
+    return buf.getvalue()
 
 st.set_page_config(page_title="AI based Price Optimization", layout="wide")
 st.title("🧮 AI Price Optimization")
@@ -21,105 +79,125 @@ data_file = st.file_uploader(
 try:
     if data_file is None:
         st.info("No file uploaded — using bundled sample data.")
-        df = load_sales("data/sales_sample.csv")
+        source = SAMPLE_PATH
+        data_key = f"{SAMPLE_PATH}@{os.path.getmtime(SAMPLE_PATH)}"
     else:
-        df = load_sales(data_file)
+        source = data_file.getvalue()
+        data_key = hashlib.sha256(source).hexdigest()
+    df = cached_sales(data_key, source)
 except Exception as e:
     st.error(f"Could not read the CSV. Check columns and types. Details: {e}")
     st.stop()
 
 # -------------------- Preview & KPIs --------------------
-st.subheader("1) Sales preview")
-st.dataframe(df.head(20), use_container_width=True)
+def sales_preview(df: pd.DataFrame):
+    st.subheader("1) Sales preview")
+    preview = df.head(20).drop(columns=["logp", "logu"], errors="ignore")
+    st.dataframe(preview, use_container_width=True, hide_index=True)
 
-total_revenue = float(df["rev"].sum()) if "rev" in df.columns else 0.0
-total_units   = float(df["units"].sum()) if "units" in df.columns else 0.0
-c1, c2 = st.columns(2)
-c1.metric("Total Revenue", f"{total_revenue:.0f}")
-c2.metric("Total Units",   f"{total_units:.0f}")
+    total_revenue = float(df["rev"].sum()) if "rev" in df.columns else 0.0
+    total_units   = float(df["units"].sum()) if "units" in df.columns else 0.0
+    c1, c2 = st.columns(2)
+    c1.metric("Total Revenue", f"{total_revenue:.0f}")
+    c2.metric("Total Units",   f"{total_units:.0f}")
 
 # -------------------- Elasticity --------------------
-st.subheader("2) Elasticity (price sensitivity)")
-elas = estimate_elasticity(df)
-st.dataframe(elas, use_container_width=True)
+def elasticity_view(elas: pd.DataFrame):
+    st.subheader("2) Elasticity (price sensitivity)")
+    st.dataframe(elas, use_container_width=True)
 
 # -------------------- Demand Curve (Plotly) --------------------
-st.subheader("3) Demand Curve (Price vs Quantity Sold)")
-selected_sku = st.selectbox("Select SKU to visualize", df["sku"].unique())
-sku_data = df[df["sku"] == selected_sku].sort_values("price")
-
-fig_demand = px.line(
-    sku_data,
-    x="price",
-    y="units",
-    markers=True,
-    title=f"Demand Curve for {selected_sku}",
-    labels={"price": "Price", "units": "Units Sold"}
-)
-st.plotly_chart(fig_demand, use_container_width=True)
+@st.fragment
+def demand_curve_view(df: pd.DataFrame, by_sku: dict):
+    st.subheader("3) Demand Curve (Price vs Quantity Sold)")
+    selected_sku = st.selectbox("Select SKU to visualize", list(by_sku))
+    if selected_sku is None:
+        # no usable rows survived load_sales; the baseline check below reports it
+        return
+    sku_data = df.iloc[by_sku[selected_sku]]
+    if len(sku_data) > MAX_CURVE_POINTS:
+        keep = LTTBDownsampler().downsample(
+            sku_data["price"].values, sku_data["units"].values, n_out=MAX_CURVE_POINTS
+        )
+        sku_data = sku_data.iloc[keep]
+
+    fig_demand = px.line(
+        sku_data,
+        x="price",
+        y="units",
+        markers=True,
+        title=f"Demand Curve for {selected_sku}",
+        labels={"price": "Price", "units": "Units Sold"}
+    )
+    st.plotly_chart(fig_demand, use_container_width=True)
 
 # -------------------- Baseline --------------------
-st.subheader("4) Baseline (latest prices & units)")
-base = latest_baseline(df)
+def baseline_view(base: pd.DataFrame):
+    st.subheader("4) Baseline (latest prices & units)")
+    st.dataframe(base, use_container_width=True)
+
+# -------------------- Baseline vs Optimized Profit (Plotly) --------------------
+def profit_bar_view(rep: pd.DataFrame):
+    st.subheader("7) Baseline vs Optimized Profit Comparison")
+    if len(rep) > MAX_BAR_SKUS:
+        rep = rep.loc[rep["delta_profit"].abs().nlargest(MAX_BAR_SKUS).index]
+
+    fig_bar = go.Figure([
+        go.Bar(name="Base Profit", x=rep["sku"], y=(rep["base_price"] - rep["cost"]) * rep["base_units"]),
+        go.Bar(name="Optimized Profit", x=rep["sku"], y=rep["opt_profit"]),
+    ])
+    fig_bar.update_layout(barmode="group", title="Baseline vs Optimized Profit per SKU")
+    st.plotly_chart(fig_bar, use_container_width=True)
+
+# -------------------- Rules & Solve --------------------
+# the sliders and Solve button only rerun this fragment, not the data pipeline above
+@st.fragment
+def rules_and_solve(data_key: str, base: pd.DataFrame, elas: pd.DataFrame):
+    st.subheader("5) Rules")
+    lb = st.slider("Lowest price (% of baseline)", 50, 100, 70)
+    ub = st.slider("Highest price (% of baseline)", 100, 200, 130)
+    min_margin = st.slider("Minimum margin over cost (%)", 0, 50, 5)
+
+    if not st.button("✨ Solve for best prices"):
+        return
+
+    price_bounds_pct = (lb / 100.0, ub / 100.0)
+    min_margin_pct = min_margin / 100.0
+    rep = cached_price_book(data_key, base, elas, price_bounds_pct, min_margin_pct)
+    if rep.empty:
+        st.error("No solution found with the current settings. Try widening the price range or lowering min margin.")
+        return
+
+    st.success("Done. One best price per SKU selected.")
+    st.dataframe(top_k(rep, MAX_TABLE_SKUS), use_container_width=True)
+    if len(rep) > MAX_TABLE_SKUS:
+        st.caption(f"Showing the {MAX_TABLE_SKUS} SKUs with the largest profit gain. Download the price book for all {len(rep)}.")
+
+    # Download button lives with the results
+    st.download_button(
+        "Download price book (CSV)",
+        price_book_csv(data_key, price_bounds_pct, min_margin_pct, rep),
+        file_name="price_book.csv",
+        mime="text/csv"
+    )
+
+    profit_bar_view(rep)
+
+# -------------------- Page --------------------
+sales_preview(df)
+
+elas = cached_elasticity(data_key, df)
+elasticity_view(elas)
+
+demand_curve_view(df, sku_positions(data_key, df))
+
+base = cached_baseline(data_key, df)
 if base.empty:
     st.warning("Baseline is empty. Check your data file.")
     st.stop()
-st.dataframe(base, use_container_width=True)
-
-# -------------------- Rules --------------------
-st.subheader("5) Rules")
-lb = st.slider("Lowest price (% of baseline)", 50, 100, 70)
-ub = st.slider("Highest price (% of baseline)", 100, 200, 130)
-min_margin = st.slider("Minimum margin over cost (%)", 0, 50, 5)
-
-rep = pd.DataFrame()  # predeclare so we can safely check later
-
-# -------------------- Solve --------------------
-if st.button("✨ Solve for best prices"):
-    chosen = solve_prices(
-        base, elas,
-        price_bounds_pct=(lb / 100.0, ub / 100.0),
-        min_margin_pct=min_margin / 100.0
-    )
-    if chosen.empty:
-        st.error("No solution found with the current settings. Try widening the price range or lowering min margin.")
-    else:
-        rep = summarize(base, chosen)
-        # Make quantities integers for realism
-        if "opt_qty" in rep.columns:
-            rep["opt_qty"] = rep["opt_qty"].round().astype(int)
-        if "base_units" in rep.columns:
-            rep["base_units"] = rep["base_units"].round().astype(int)
-
-        st.success("Done. One best price per SKU selected.")
-        st.dataframe(rep, use_container_width=True)
-
-        # Download button lives with the results
-        st.download_button(
-            "Download price book (CSV)",
-            rep.to_csv(index=False),
-            file_name="price_book.csv",
-            mime="text/csv"
-        )
+baseline_view(base)
 
-        # -------------------- Baseline vs Optimized Profit (Plotly) --------------------
-        st.subheader("7) Baseline vs Optimized Profit Comparison")
-        rep_plot = rep.copy()
-        rep_plot["Base Profit"] = (rep_plot["base_price"] - rep_plot["cost"]) * rep_plot["base_units"]
-        rep_plot["Optimized Profit"] = rep_plot["opt_profit"]
-
-        plot_data = rep_plot.melt(
-            id_vars=["sku"],
-            value_vars=["Base Profit", "Optimized Profit"],
-            var_name="Type",
-            value_name="Profit"
-        )
-
-        fig_bar = px.bar(
-            plot_data, x="sku", y="Profit", color="Type", barmode="group",
-            title="Baseline vs Optimized Profit per SKU"
-        )
-        st.plotly_chart(fig_bar, use_container_width=True)
+rules_and_solve(data_key, base, elas)
 
 st.caption("Tip: If you upload your own data, keep columns exactly: date, sku, price, units, cost.")
 
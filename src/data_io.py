@@ -1,26 +1,35 @@
+import numpy as np
 import pandas as pd
 
 def load_sales(path) -> pd.DataFrame:
-    df = pd.read_csv(path, parse_dates=["date"])
+    df = pd.read_csv(path, engine="pyarrow", parse_dates=["date"])
     df = df.dropna(subset=["sku", "price", "units", "cost"])
     df["price"] = pd.to_numeric(df["price"], errors="coerce")
     df["units"] = pd.to_numeric(df["units"], errors="coerce")
     df["cost"]  = pd.to_numeric(df["cost"],  errors="coerce")
     df = df.dropna(subset=["price", "units", "cost"])
+    # only units is narrowed: float32 has no cent resolution above ~131k, which
+    # JPY/KRW-scale price books hit, so price and cost stay float64
+    df["units"] = df["units"].astype("float32")
     df = df[df["price"] > 0]
+    df["sku"] = df["sku"].astype("category")
     df["rev"] = df["price"] * df["units"]
     df["margin_unit"] = df["price"] - df["cost"]
+    # log terms for the log-log demand fit; rows without sales get NaN
+    df["logp"] = np.log(df["price"], dtype=np.float32)
+    df["logu"] = np.log(df["units"].where(df["units"] > 0), dtype=np.float32)
     return df
 
 def latest_baseline(df: pd.DataFrame) -> pd.DataFrame:
-    latest_mask = df.groupby("sku")["date"].transform("max") == df["date"]
+    latest_mask = df.groupby("sku", observed=True, sort=False)["date"].transform("max") == df["date"]
     base = (
         df[latest_mask]
-        .groupby("sku", as_index=False)
+        .groupby("sku", as_index=False, observed=True, sort=False)
         .agg(
             base_price=("price", "mean"),
             base_units=("units", "mean"),
             cost=("cost", "mean"),
         )
     )
+    base["base_units"] = base["base_units"].astype("float64")
     return base
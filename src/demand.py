@@ -1,19 +1,39 @@
 import numpy as np
 import pandas as pd
-from sklearn.linear_model import LinearRegression
 
 def estimate_elasticity(df: pd.DataFrame) -> pd.DataFrame:
-    out = []
-    for sku, g in df.groupby("sku"):
-        g = g[(g["units"] > 0) & (g["price"] > 0)]
-        if len(g) < 3:
-            out.append({"sku": sku, "elasticity": -1.0})
-            continue
-        X = np.log(g["price"].values).reshape(-1, 1)
-        y = np.log(g["units"].values)
-        lr = LinearRegression().fit(X, y)
-        out.append({"sku": sku, "elasticity": float(lr.coef_[0])})
-    return pd.DataFrame(out)
+    skus = df["sku"].unique()
+    if "logp" not in df.columns or "logu" not in df.columns:
+        # frames not produced by load_sales: take logs here, skipping non-positive rows
+        df = df.assign(
+            logp=np.log(df["price"].where(df["price"] > 0)),
+            logu=np.log(df["units"].where(df["units"] > 0)),
+        )
+    df = df.dropna(subset=["logp", "logu"])
+    # float32 logs are widened so the sum-of-squares terms don't cancel out
+    lp = df["logp"].to_numpy(dtype=np.float64)
+    lq = df["logu"].to_numpy(dtype=np.float64)
+
+    # log-log OLS slope per SKU from grouped sums: cov(lp, lq) / var(lp)
+    agg = (
+        df[["sku"]]
+        .assign(lp=lp, lq=lq, lp2=lp * lp, lpq=lp * lq)
+        .groupby("sku", observed=True, sort=False)
+        .agg(
+            n=("lp", "size"),
+            sx=("lp", "sum"),
+            sy=("lq", "sum"),
+            sxx=("lp2", "sum"),
+            sxy=("lpq", "sum"),
+        )
+        .reindex(skus)
+    )
+    sxx = agg["sxx"] - agg["sx"] * agg["sx"] / agg["n"]
+    sxy = agg["sxy"] - agg["sx"] * agg["sy"] / agg["n"]
+    ok = (agg["n"] >= 3) & (sxx > 1e-12 * agg["sxx"])
+    beta = (sxy / sxx.where(ok)).fillna(-1.0)
+
+    return pd.DataFrame({"sku": skus, "elasticity": beta.values.astype(float)})
 
 def demand_at_price(base_units, base_price, elasticity, new_price):
     return base_units * (new_price / base_price) ** elasticity
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 def summarize(base: pd.DataFrame, chosen: pd.DataFrame) -> pd.DataFrame:
@@ -5,4 +6,10 @@ def summarize(base: pd.DataFrame, chosen: pd.DataFrame) -> pd.DataFrame:
     df["base_profit"] = (df["base_price"] - df["cost"]) * df["base_units"]
     df["delta_profit"] = df["opt_profit"] - df["base_profit"]
     df["delta_price_pct"] = (df["opt_price"] / df["base_price"] - 1.0) * 100
-    return df.sort_values("delta_profit", ascending=False)
+    return df
+
+def top_k(df: pd.DataFrame, k: int = 50, by: str = "delta_profit") -> pd.DataFrame:
+    if len(df) > k:
+        idx = np.argpartition(-df[by].values, k - 1)[:k]
+        df = df.iloc[idx]
+    return df.sort_values(by, ascending=False)